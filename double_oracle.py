@@ -0,0 +1,128 @@
+# Sequence-form double oracle.
+#
+# Starts with a restricted game, where only the first action of every infoset
+# can be played, and repeats:
+#   - solve the sequence-form LP of the restricted game for both players,
+#   - compute best responses of both players in the whole game against the
+#     restricted equilibrium strategies of their opponents,
+#   - add the actions of the best responses to the restricted game,
+# until the best responses bound the game value tightly enough.
+#
+# Only the restricted game is ever turned into an LP, the whole tree is only
+# walked by the best responses, which keep data per sequence of one player.
+from game_lp import *
+
+
+def best_response(root: History, player: Player, plan, allowed):
+    """
+    Best response of the player in the whole game against the opponent's restricted strategy.
+
+    :param root: root history of the EFG tree
+    :param player: zero-indexed player responding
+    :param plan: opponent's realization plan in the restricted game, from solve_lp
+    :param allowed: restriction of the game, see compile_lp
+    :return: tuple (expected value in the root for the player,
+                    {infoset index: action index} of the infosets the response reaches)
+    """
+    player = int(player)
+    # player's sequence -> utility of the terminals reached directly by it
+    direct = {}
+    # player's sequence -> infosets of the player that follow it
+    next_infosets = {}
+    # infoset index -> number of actions
+    n_actions = {}
+
+    def behavior(seq, info_idx, a_id):
+        # probability of the opponent playing the action in the infoset, seq leads to the infoset
+        next_seq = seq + ((info_idx, a_id),)
+        if next_seq in plan:
+            return plan[next_seq] / plan[seq] if plan.get(seq, 0) > 0 else 0
+        # infoset not reached in the restricted game, the restricted strategy plays its first allowed action
+        return 1 if a_id == min(allowed.get(info_idx, (0,))) else 0
+
+    def walk(h, my_seq, o_seq, reach):
+        t = h.type()
+        if t == HistoryType.terminal:
+            util = h.utility() if player == 0 else -h.utility()
+            direct[my_seq] = direct.get(my_seq, 0) + reach * util
+        elif t == HistoryType.chance:
+            for a in h.actions():
+                walk(h.child(a), my_seq, o_seq, reach * h.chance_prob(a))
+        else:
+            actions = h.actions()
+            info_idx = h.infoset().index()
+            if int(h.current_player()) == player:
+                next_infosets.setdefault(my_seq, set()).add(info_idx)
+                n_actions[info_idx] = len(actions)
+                for a_id, a in enumerate(actions):
+                    walk(h.child(a), my_seq + ((info_idx, a_id),), o_seq, reach)
+            else:
+                for a_id, a in enumerate(actions):
+                    prob = behavior(o_seq, info_idx, a_id)
+                    if prob > 0:
+                        walk(h.child(a), my_seq, o_seq + ((info_idx, a_id),), reach * prob)
+
+    walk(root, (), (), 1)
+
+    response = {}
+
+    def value(seq):
+        res = direct.get(seq, 0)
+        for info_idx in next_infosets.get(seq, ()):
+            if n_actions[info_idx] == 0:
+                continue
+            values = [value(seq + ((info_idx, a_id),)) for a_id in range(n_actions[info_idx])]
+            best = max(range(len(values)), key=lambda a_id: values[a_id])
+            response[info_idx] = best
+            res += values[best]
+        return res
+
+    return value(()), response
+
+
+def double_oracle(root: History, player: Player, eps: float = 1e-6, max_iterations: int = 1000) -> float:
+    """
+    Solve the game with the double oracle algorithm.
+
+    :param root: root history of the EFG tree
+    :param player: zero-indexed player
+    :param eps: the algorithm stops once the best responses bound the value within eps
+    :param max_iterations: the algorithm stops after this many restricted games
+    :return: expected value in the root for given player
+    :raises RuntimeError: if the value is not bounded within eps after max_iterations
+    """
+    if max_iterations < 1:
+        raise ValueError(f"max_iterations must be at least 1, got {max_iterations}")
+    player = int(player)
+    allowed = {}
+    for _ in range(max_iterations):
+        values, plans = {}, {}
+        for p in (0, 1):
+            values[p], plans[p] = solve_lp(compile_lp(root, p, allowed), p)
+
+        # the agent's response to the bandit's strategy bounds the value from above,
+        # the bandit's response to the agent's strategy bounds it from below
+        upper, response_0 = best_response(root, 0, plans[1], allowed)
+        lower, response_1 = best_response(root, 1, plans[0], allowed)
+        lower = -lower
+
+        added = 0
+        for info_idx, a_id in list(response_0.items()) + list(response_1.items()):
+            actions = allowed.setdefault(info_idx, {0})
+            if a_id not in actions:
+                actions.add(a_id)
+                added += 1
+
+        # without new actions, both responses are in the restricted game, any gap is rounding
+        if upper - lower <= eps or added == 0:
+            return values[player]
+
+    raise RuntimeError(f"double oracle stopped without converging, "
+                       f"the first player's value is in [{lower}, {upper}]")
+
+
+if __name__ == '__main__':
+    # same input as game_lp.py
+    root_history = create_root()
+    player = int(input())
+    print(double_oracle(root_history, player))
@@ -0,0 +1,291 @@
+# Import of game trees in the Gambit .efg format (as written by export_gambit)
+# and the sequence-form LP over the imported trees.
+#
+# The file is parsed as a stream of tokens and the tree is stored in flat
+# arrays indexed by the position of the node in the file (preorder), so no
+# Python object is created per node. Only per infoset and per sequence data is
+# kept in dicts.
+#
+# The games are expected to be two-player zero-sum, only the payoffs of the
+# first player are used.
+import re
+import sys
+from array import array
+from fractions import Fraction
+from math import isnan, nan
+from typing import Optional
+
+import gurobipy as gb
+from gurobipy import GRB
+
+TERMINAL = 0
+CHANCE = 1
+DECISION = 2
+
+TOKEN = re.compile(r'"((?:[^"\\]|\\.)*)"|([{}])|([^\s{},"]+)')
+
+
+class FlatTree:
+    def __init__(self):
+        # per node, in preorder
+        self.kind = array('b')
+        self.player = array('b')  # zero-indexed, -1 for chance and terminal nodes
+        self.infoset = array('l')  # gambit's infoset number (per player), -1 for terminals
+        self.n_actions = array('l')
+        self.prob = array('d')  # probability of the edge from a chance parent, 1 otherwise
+        self.payoff = array('d')  # first player's payoff in terminals, 0 otherwise
+
+    def __len__(self):
+        return len(self.kind)
+
+
+class Tokens:
+    """Tokens of the file: quoted strings are returned as ('"', text), the rest as ('', text)."""
+
+    def __init__(self, f):
+        self.tokens = self.__read(f)
+        self.peeked = None
+
+    @staticmethod
+    def __read(f):
+        for line in f:
+            for string, brace, word in TOKEN.findall(line):
+                if brace or word:
+                    yield '', brace or word
+                else:
+                    yield '"', string
+
+    def next(self):
+        if self.peeked is not None:
+            token, self.peeked = self.peeked, None
+            return token
+        token = next(self.tokens, None)
+        if token is None:
+            raise ValueError("unexpected end of the .efg file")
+        return token
+
+    def peek(self):
+        if self.peeked is None:
+            self.peeked = next(self.tokens, None)
+        return self.peeked
+
+    def expect(self, text):
+        token = self.next()
+        if token != ('', text):
+            raise ValueError(f"expected {text} in the .efg file, got {token[1]}")
+
+    def word(self) -> str:
+        quoted, text = self.next()
+        if quoted:
+            raise ValueError(f"expected a value in the .efg file, got \"{text}\"")
+        return text
+
+    def number(self) -> float:
+        return float(Fraction(self.word()))
+
+    def skip_string(self):
+        if self.peek() is not None and self.peek()[0] == '"':
+            self.next()
+
+
+def read_efg(path: str) -> FlatTree:
+    """
+    Read a two-player game tree from a Gambit .efg file.
+
+    :param path: path to the .efg file
+    :return: the tree as flat arrays
+    """
+    tree = FlatTree()
+    # (player, infoset) -> number of actions, later nodes of an infoset may omit the actions
+    infoset_actions = {}
+    # first player's payoff indexed by the outcome number, nan if not given (yet),
+    # later uses of an outcome may omit the payoffs
+    outcomes = array('d')
+    # open nodes: [remaining children, probabilities of chance children or None, accumulated payoff]
+    stack = []
+
+    with open(path) as f:
+        tokens = Tokens(f)
+        tokens.expect("EFG")
+        tokens.expect("2")
+        # rational or floating point numbers, both are parsed the same
+        precision = tokens.word()
+        if precision not in ("R", "D"):
+            raise ValueError(f"expected R or D in the .efg file, got {precision}")
+        tokens.skip_string()
+        tokens.expect("{")
+        n_players = 0
+        while tokens.peek() is not None and tokens.peek()[0] == '"':
+            tokens.next()
+            n_players += 1
+        tokens.expect("}")
+        if n_players != 2:
+            raise ValueError(f"expected a two-player game, got {n_players} players")
+        tokens.skip_string()  # comment
+
+        def read_outcome():
+            outcome = int(tokens.word())
+            tokens.skip_string()
+            if tokens.peek() == ('', "{"):
+                tokens.next()
+                payoffs = []
+                while tokens.peek() != ('', "}"):
+                    payoffs.append(tokens.number())
+                tokens.next()
+                if len(payoffs) == 0:
+                    raise ValueError(f"outcome {outcome} has no payoffs in the .efg file")
+                if outcome >= len(outcomes):
+                    outcomes.extend([nan] * (outcome + 1 - len(outcomes)))
+                outcomes[outcome] = payoffs[0]
+            if outcome == 0:
+                return 0.0
+            if outcome >= len(outcomes) or isnan(outcomes[outcome]):
+                raise ValueError(f"outcome {outcome} is used before its payoffs are given")
+            return outcomes[outcome]
+
+        while tokens.peek() is not None:
+            if len(tree) > 0 and len(stack) == 0:
+                raise ValueError("the .efg file contains more than one tree")
+            kind = tokens.word()
+            tokens.skip_string()  # node name
+
+            prob, payoff = 1.0, 0.0
+            if len(stack) > 0:
+                parent = stack[-1]
+                if parent[1] is not None:
+                    prob = parent[1][-parent[0]]
+                payoff = parent[2]
+                parent[0] -= 1
+                if parent[0] == 0:
+                    stack.pop()
+
+            if kind == "t":
+                tree.kind.append(TERMINAL)
+                tree.player.append(-1)
+                tree.infoset.append(-1)
+                tree.n_actions.append(0)
+                payoff += read_outcome()
+            elif kind in ("c", "p"):
+                player = -1 if kind == "c" else int(tokens.word()) - 1
+                infoset = int(tokens.word())
+                tokens.skip_string()
+                probs = [] if kind == "c" else None
+                n_actions = None
+                if tokens.peek() == ('', "{"):
+                    tokens.next()
+                    n_actions = 0
+                    while tokens.peek() != ('', "}"):
+                        tokens.next()  # action name
+                        if kind == "c":
+                            probs.append(tokens.number())
+                        n_actions += 1
+                    tokens.next()
+                    infoset_actions[(player, infoset)] = (n_actions, probs)
+                elif (player, infoset) in infoset_actions:
+                    n_actions, probs = infoset_actions[(player, infoset)]
+                else:
+                    raise ValueError(f"actions of infoset {infoset} of player {player + 1} are not given")
+                payoff += read_outcome()
+
+                tree.kind.append(CHANCE if kind == "c" else DECISION)
+                tree.player.append(player)
+                tree.infoset.append(infoset)
+                tree.n_actions.append(n_actions)
+                if n_actions > 0:
+                    stack.append([n_actions, probs, payoff])
+                payoff = 0.0
+            else:
+                raise ValueError(f"unknown node type {kind} in the .efg file")
+
+            tree.prob.append(prob)
+            tree.payoff.append(payoff)
+
+    if len(stack) > 0:
+        raise ValueError("the .efg file ends in the middle of the tree")
+    return tree
+
+
+def flat_root_value(tree: FlatTree, player: int, env: Optional[gb.Env] = None) -> float:
+    """
+    Create sequence-form LP from the flat tree and solve it, the same LP as root_value.
+
+    :param tree: tree from read_efg
+    :param player: zero-indexed player the LP is built for
+    :param env: gurobi environment to create the model in, default one if None
+    :return: expected value in the root for given player
+    """
+    # sequences are identified by their last (infoset, action index), None is the empty sequence
+    # infoset of the player -> (parent sequence, number of actions)
+    infosets = {}
+    # opponent's sequence -> {("r", player's sequence) | ("v", opponent's infoset): coefficient}
+    rows = {None: {}}
+
+    # open nodes: [node, next action, chance probability, player's sequence, opponent's sequence]
+    stack = []
+    for node in range(len(tree)):
+        if len(stack) == 0:
+            prob, seqs = 1.0, [None, None]
+        else:
+            frame = stack[-1]
+            parent, action = frame[0], frame[1]
+            prob, seqs = frame[2], frame[3:]
+            if tree.kind[parent] == CHANCE:
+                prob *= tree.prob[node]
+            else:
+                seqs = list(seqs)
+                seqs[tree.player[parent] != player] = (tree.player[parent], tree.infoset[parent], action)
+            frame[1] += 1
+            if frame[1] == tree.n_actions[parent]:
+                stack.pop()
+
+        kind = tree.kind[node]
+        if kind == TERMINAL:
+            row = rows.setdefault(seqs[1], {})
+            key = ("r", seqs[0])
+            row[key] = row.get(key, 0.0) + prob * tree.payoff[node]
+            continue
+
+        if kind == DECISION:
+            infoset = (tree.player[node], tree.infoset[node])
+            if tree.player[node] == player:
+                infosets[infoset] = (seqs[0], tree.n_actions[node])
+            else:
+                rows.setdefault(seqs[1], {})[("v", infoset)] = 1.0
+        stack.append([node, 0, prob] + list(seqs))
+
+    m = gb.Model("tree_game", env=env)
+    m.setParam("OutputFlag", 0)
+
+    prob_vars = {None: m.addVar(name="r_root")}
+    for (p, i), (parent, n_actions) in infosets.items():
+        for a in range(n_actions):
+            prob_vars[(p, i, a)] = m.addVar(name=f"r_{i}_{a}")
+    for (p, i), (parent, n_actions) in infosets.items():
+        m.addConstr(gb.quicksum(prob_vars[(p, i, a)] for a in range(n_actions)) == prob_vars[parent])
+    m.addConstr(prob_vars[None] == 1)
+
+    # the payoffs can be negative, so the values are free
+    val_vars = {None: m.addVar(lb=-GRB.INFINITY, name="val_root")}
+    for seq in rows:
+        if seq is not None and (seq[0], seq[1]) not in val_vars:
+            val_vars[(seq[0], seq[1])] = m.addVar(lb=-GRB.INFINITY, name=f"val_{seq[1]}")
+
+    for seq, row in rows.items():
+        expr = gb.quicksum(coef * (prob_vars[key[1]] if key[0] == "r" else val_vars[key[1]])
+                           for key, coef in row.items())
+        own = val_vars[None] if seq is None else val_vars[(seq[0], seq[1])]
+        if player == 0:
+            m.addConstr(expr >= own)
+        else:
+            m.addConstr(expr <= own)
+    m.setObjective(val_vars[None], GRB.MAXIMIZE if player == 0 else GRB.MINIMIZE)
+
+    m.optimize()
+
+    # I minimize the first player's utility, thus for the second player i must return the negative value
+    return m.ObjVal if player == 0 else -m.ObjVal
+
+
+if __name__ == '__main__':
+    # usage: python gambit_import.py efg_file player
+    print(flat_root_value(read_efg(sys.argv[1]), int(sys.argv[2])))
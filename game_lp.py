@@ -98,43 +98,22 @@ def root_value(root: History, player: Player) -> float:
                     second player has index 1
     :return: expected value in the root for given player
     """
-    # sequence is a list of tuples (infoset index, action index), this is list of sequences for each player
-    # sequence is a list of tuples (infoset index, action index), this is map of sequences to their ids for each player
-    sequences = {0:{}, 1:{}}
-
-    # [(infoset index, action index)] -> int index - will be used to set a variable in lp - for player
-    # seq_ID -> int index - will be used to set a variable in lp - for player - useless, use seq_ID
-    # sequence_probs = {}
-
-    # (infoset index, action index) -> [(my sequence, prob, g val) | (None, prob, infoset id)]  - for other player, potentially creates multiple same constraints
-    # (infoset index, action index) -> [(seq_ID, prob, g val) | (None, prob, infoset id)]  - for other player, potentially creates multiple same constraints
-    sum_constraints = {}
-
-    # [(infoset index, action index)] -> [[(infoset index, action index)]] - for player, decides which sequences should sum to this one.
-    # (seq_ID, curr_infoset_id) -> [seq_ID] - for player, decides which sequences should sum to this one.
-    next_seqs = {}
-
-    # id_counter = 0
-
-    # root sequences
-    curr_seq = {0:Sequence(), 1:Sequence()}
-    sequences[0][Sequence()] = 0#id_counter
-    sequences[1][Sequence()] = 1#id_counter + 1
-
-    # next_seqs[(sequences[player][Sequence()], None)] = []
-    sum_constraints[(None, None)] = []
+    return solve_lp(compile_lp(root, player), player)[0]
 
-    build_lp(root, curr_seq, 1, player, sequences, sum_constraints, next_seqs, 2)#id_counter+2)
 
-    # for seq in sequences[player]:
-    #     print(seq.seq, sequences[player][seq])
-
-    # print()
+def solve_lp(compiled, player: Player, env: Optional[gb.Env] = None):
+    """
+    Build the gurobi model from a compiled tree and solve it.
 
-    # for seq in sequences[(player+1) % 2]:
-    #     print(seq.seq, sequences[(player+1) % 2][seq])
+    :param compiled: result of compile_lp for the same player
+    :param player: zero-indexed player the LP is built for
+    :param env: gurobi environment to create the model in, default one if None
+    :return: tuple (expected value in the root for the player,
+                    realization plan {sequence as tuple of (infoset index, action index): probability})
+    """
+    sequences, sum_constraints, next_seqs = compiled
 
-    m = gb.Model("tree_game")
+    m = gb.Model("tree_game", env=env)
     m.setParam("OutputFlag", 0)
 
     # for each of my sequences, create a prob sum constraint
@@ -193,16 +172,71 @@ def root_value(root: History, player: Player) -> float:
     # for v in m.getVars():
     #     print(f"{v.varName} = {v.x}")
 
+    plan = {tuple(seq.seq): prob_vars[seq_id].X for seq, seq_id in sequences[player].items()}
+
     # I minimize the first player's utility, thus for the second player i must return the negative value
-    return m.ObjVal if player == 0 else -m.ObjVal
+    return (m.ObjVal if player == 0 else -m.ObjVal), plan
+
+
+def compile_lp(root: History, player: Player, allowed=None):
+    """
+    Walk the EFG tree once and collect the structure of the sequence-form LP.
+
+    :param root: root history of the EFG tree
+    :param player: zero-indexed player the LP is built for
+    :param allowed: restricts the game, {infoset index: set of allowed action indices},
+                    only the first action is allowed in infosets missing from it.
+                    The whole game if None.
+    :return: tuple (sequences, sum_constraints, next_seqs), see build_lp
+    """
+    # sequence is a list of tuples (infoset index, action index), this is list of sequences for each player
+    # sequence is a list of tuples (infoset index, action index), this is map of sequences to their ids for each player
+    sequences = {0:{}, 1:{}}
+
+    # [(infoset index, action index)] -> int index - will be used to set a variable in lp - for player
+    # seq_ID -> int index - will be used to set a variable in lp - for player - useless, use seq_ID
+    # sequence_probs = {}
+
+    # (infoset index, action index) -> [(my sequence, prob, g val) | (None, prob, infoset id)]  - for other player, potentially creates multiple same constraints
+    # (infoset index, action index) -> [(seq_ID, prob, g val) | (None, prob, infoset id)]  - for other player, potentially creates multiple same constraints
+    sum_constraints = {}
+
+    # [(infoset index, action index)] -> [[(infoset index, action index)]] - for player, decides which sequences should sum to this one.
+    # (seq_ID, curr_infoset_id) -> [seq_ID] - for player, decides which sequences should sum to this one.
+    next_seqs = {}
+
+    # id_counter = 0
+
+    # root sequences
+    curr_seq = {0:Sequence(), 1:Sequence()}
+    sequences[0][Sequence()] = 0#id_counter
+    sequences[1][Sequence()] = 1#id_counter + 1
+
+    # next_seqs[(sequences[player][Sequence()], None)] = []
+    sum_constraints[(None, None)] = []
+
+    build_lp(root, curr_seq, 1, player, sequences, sum_constraints, next_seqs, 2, allowed)#id_counter+2)
+
+    # for seq in sequences[player]:
+    #     print(seq.seq, sequences[player][seq])
+
+    # print()
+
+    # for seq in sequences[(player+1) % 2]:
+    #     print(seq.seq, sequences[(player+1) % 2][seq])
+
+    return sequences, sum_constraints, next_seqs
 
 
-def build_lp(h, curr_seq, prob, player, sequences, sum_constraints, next_seqs, id_counter):
+def build_lp(h, curr_seq, prob, player, sequences, sum_constraints, next_seqs, id_counter, allowed=None):
     # chance nodes, terminals
     t = h.type()
     if t == HistoryType.terminal:
         o_player = (player + 1) % 2
-        constr_id = curr_seq[o_player][-1]
+        if len(curr_seq[o_player]) == 0:
+            constr_id = (None, None)
+        else:
+            constr_id = curr_seq[o_player][-1]
         if constr_id not in sum_constraints:
             sum_constraints[constr_id] = []
         seq_id = sequences[player][curr_seq[player]]
@@ -213,7 +247,7 @@ def build_lp(h, curr_seq, prob, player, sequences, sum_constraints, next_seqs, i
         actions = h.actions()
         for a in actions:
             next_prob = h.chance_prob(a) * prob
-            id_counter = build_lp(h.child(a), curr_seq, next_prob, player, sequences, sum_constraints, next_seqs, id_counter)
+            id_counter = build_lp(h.child(a), curr_seq, next_prob, player, sequences, sum_constraints, next_seqs, id_counter, allowed)
 
     else:
         curr_player = int(h.current_player())
@@ -222,6 +256,8 @@ def build_lp(h, curr_seq, prob, player, sequences, sum_constraints, next_seqs, i
         # print(actions)
 
         for a_id, a in enumerate(actions):
+            if allowed is not None and a_id not in allowed.get(info_idx, (0,)):
+                continue
             # before entering next history add it to next seqs, sum const etc...
             next_p_seq = deepcopy(curr_seq[curr_player])
             next_p_seq.append((info_idx, a_id))
@@ -280,7 +316,7 @@ def build_lp(h, curr_seq, prob, player, sequences, sum_constraints, next_seqs, i
             #         if constr_id not in sum_constraints:
             #             sum_constraints[constr_id] = []
             #         sum_constraints[constr_id].append((None, prob, next_h.infoset().index()))
-            id_counter = build_lp(next_h, next_seq, prob, player, sequences, sum_constraints, next_seqs, id_counter)
+            id_counter = build_lp(next_h, next_seq, prob, player, sequences, sum_constraints, next_seqs, id_counter, allowed)
 
     return id_counter
 
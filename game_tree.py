@@ -3,6 +3,7 @@ from typing import List, Optional, Tuple
 
 from copy import deepcopy
 from itertools import combinations
+from threading import Lock
 
 # Do not print anything besides the tree in your submission.
 # Implement all methods, the __str__ methods are optional (for nice labels).
@@ -12,6 +13,8 @@ from itertools import combinations
 infoset_counter = 0
 infoset_map_agent = {}
 infoset_map_bandit = {}
+# guards the maps above, trees may be built from several threads at once
+infoset_lock = Lock()
 
 class HistoryType(IntEnum):
     decision = 1
@@ -119,14 +122,23 @@ class Pos:
         return f"[{self.x}, {self.y}]"
 
 class Game:
-    def __init__(self):
-        h = int(input())
-        w = int(input())
+    def __init__(self, lines: Optional[List[str]] = None):
+        # the maze is read from stdin, unless its lines are supplied directly
+        read = input if lines is None else iter(lines).__next__
+        h = int(read())
+        w = int(read())
         self.mazebox = [None] * h
         for i in range(h):
-            self.mazebox[i] = list(map(map_tile, input()))
-        self.n_bandits = int(input())
-        self.ambush_prob = float(input())
+            self.mazebox[i] = list(map(map_tile, read().strip()))
+        self.n_bandits = int(read())
+        self.ambush_prob = float(read())
+
+        # collapse agent's moves that can never reach the goal, see History.child
+        self.prune = True
+        # (position, action type) -> position where the corridor ends
+        self.corridor_ends = {}
+        # infosets are indexed in the global maps, unless the game gets its own InfosetMaps
+        self.infoset_maps = None
 
         self.start_pos = None
         self.dangers = []
@@ -162,34 +174,80 @@ class Game:
         events.append((None, action, pos))
         return events
 
+    def __deepcopy__(self, memo):
+        # the maze does not change during the game, all histories share it (and its corridor_ends)
+        return self
+
+    def corridor_end(self, pos: Pos, action: Action) -> Pos:
+        key = (pos, action.action_type)
+        if key not in self.corridor_ends:
+            self.corridor_ends[key] = self.walk_path(pos, action)[-1][2]
+        return self.corridor_ends[key]
+
+    def can_reach_goal(self, pos: Pos, blocked: List[Pos]) -> bool:
+        # search over the crossroads, the crossroads in blocked cannot be entered
+        if self.goal(pos):
+            return True
+        if pos in blocked:
+            return False
+        seen = {pos}
+        queue = [pos]
+        while len(queue) > 0:
+            crossroad = queue.pop()
+            for action in self.get_actions(crossroad):
+                end = self.corridor_end(crossroad, action)
+                if self.goal(end):
+                    return True
+                if end not in seen and end not in blocked:
+                    seen.add(end)
+                    queue.append(end)
+        return False
+
     def at(self, pos: Pos) -> Tile:
         return self.mazebox[pos.y][pos.x]
 
     def goal(self, pos: Pos) -> bool:
         return self.mazebox[pos.y][pos.x] == Tile.goal
 
+class InfosetMaps:
+    """Infoset indexing of a single game, can be freed together with the game."""
+
+    def __init__(self):
+        self.counter = 0
+        self.agent = {}
+        self.bandit = {}
+
+
 class Infoset:
     def __init__(self, curr_history: 'History'):
         self.h = curr_history
 
     def index(self) -> str:
+        maps = self.h.game.infoset_maps
+        if maps is not None:
+            return self.__index(maps)
+        with infoset_lock:
+            return self.__index(None)
+
+    def __index(self, maps: Optional['InfosetMaps']) -> str:
         global infoset_counter, infoset_map_agent, infoset_map_bandit
         if self.h.player == Player.agent:
             id_infoset = "1" + f"{self.h.crossroad_actions} {self.h.n_bandits} {self.h.gold} {self.h.curr_pos} {self.h.combat_points} {self.h.seen_danger}"
-            # print(id_infoset)
-            if id_infoset not in infoset_map_agent:
-                infoset_map_agent[id_infoset] = infoset_counter
-                infoset_counter += 1
-            return infoset_map_agent[id_infoset]
-        if self.h.player == Player.bandit:
+            infoset_map = infoset_map_agent if maps is None else maps.agent
+        elif self.h.player == Player.bandit:
             id_infoset = "2"+" ".join(map(lambda x: f"{x}", self.h.bandits_positions))+f"{self.h.curr_pos}"
-            # print(id_infoset)
-            if id_infoset not in infoset_map_bandit:
-                infoset_map_bandit[id_infoset] = infoset_counter
+            infoset_map = infoset_map_bandit if maps is None else maps.bandit
+        else:
+            return None
+        # print(id_infoset)
+        if id_infoset not in infoset_map:
+            if maps is None:
+                infoset_map[id_infoset] = infoset_counter
                 infoset_counter += 1
-            return infoset_map_bandit[id_infoset]
-        # else:
-        #     print("This does not happen")
+            else:
+                infoset_map[id_infoset] = maps.counter
+                maps.counter += 1
+        return infoset_map[id_infoset]
 
     def __str__(self):
         return ""
@@ -210,6 +268,7 @@ class History:
         self.gold = 0
         self.n_bandits = game.n_bandits
         self.dead = False
+        self.pruned = False
         self.seen_danger = False
         self.event_buffer = []
 
@@ -270,7 +329,7 @@ class History:
 
 
     def type(self) -> HistoryType:
-        if self.dead or (len(self.event_buffer) == 0 and len(self.__agent_actions()) == 0):
+        if self.dead or self.pruned or (len(self.event_buffer) == 0 and len(self.__agent_actions()) == 0):
             return HistoryType.terminal
         if self.__ambush():
             return HistoryType.chance
@@ -326,6 +385,17 @@ class History:
             # next_h.curr_pos = next_h.curr_pos.apply_action(action)
             next_h.crossroad_actions.append(action)
             next_h.visited_crossroads.append(self.curr_pos)
+            if self.game.prune and not self.game.can_reach_goal(
+                    self.game.corridor_end(self.curr_pos, action), next_h.visited_crossroads):
+                # Whatever happens after this move, the agent ends stuck in a visited
+                # crossroad, in a dead end or ambushed, never in the goal - every
+                # terminal below has utility 0. Replacing the subtree by a terminal
+                # with utility 0 thus keeps the utility of every pair of strategies,
+                # so the value of the game is the same. The agent's infosets below are
+                # all inside the subtree (they contain crossroad_actions), bandit's
+                # infosets only lose histories in which their actions change nothing.
+                next_h.pruned = True
+                return next_h
             next_h.event_buffer = self.game.walk_path(self.curr_pos, action)
             # for b in next_h.event_buffer:
             #     print(b)
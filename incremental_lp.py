@@ -0,0 +1,124 @@
+# Incremental re-solving of the sequence-form LP for edited mazes.
+#
+# The LP built by root_value is keyed by sequence ids that depend on the order
+# in which the tree is walked, so a single edited tile reshuffles all of them.
+# Here every column and row is keyed by its content instead - sequences by
+# their (infoset index, action index) tuples, infoset values by the infoset
+# index. Infoset indices come from the global maps in game_tree, which are
+# keyed by the (maze independent) description of the infoset, so parts of the
+# tree that did not change after an edit produce exactly the same keys.
+#
+# One Gurobi model is kept per solver. After an edit, only the columns and rows
+# that differ from the previous compiled tree are removed and added, and the
+# re-solve starts from the basis of the previous solution.
+from game_lp import *
+
+import sys
+
+
+class IncrementalSolver:
+    def __init__(self, player: Player):
+        self.player = int(player)
+        self.m = None
+        # ("r", sequence) | ("v", infoset index) | ("root",) -> gurobi variable
+        self.vars = {}
+        # row key -> (coefficients {var key: coef}, sense, rhs, gurobi constraint)
+        self.rows = {}
+        # number of removed and added columns and rows in the last solve
+        self.changes = {}
+
+    def compile(self, root: History):
+        """
+        Compile the tree into columns and rows keyed by their content.
+
+        :param root: root history of the EFG tree
+        :return: tuple (set of variable keys, {row key: (coefficients, sense, rhs)})
+        """
+        sequences, sum_constraints, next_seqs = compile_lp(root, self.player)
+        seq_keys = {seq_id: tuple(seq.seq) for seq, seq_id in sequences[self.player].items()}
+
+        cols = {("r", key) for key in seq_keys.values()} | {("root",)}
+        rows = {("fix",): ({("r", ()): 1.0}, GRB.EQUAL, 1.0)}
+
+        for (s, info_idx), next_ss in next_seqs.items():
+            if len(next_ss) != 0:
+                coefs = {("r", seq_keys[ns]): 1.0 for ns in next_ss}
+                coefs[("r", seq_keys[s])] = -1.0
+                rows[("next", seq_keys[s], info_idx)] = (coefs, GRB.EQUAL, 0.0)
+
+        sense = GRB.GREATER_EQUAL if self.player == 0 else GRB.LESS_EQUAL
+        for parent, children in sum_constraints.items():
+            coefs = {}
+            for seq_id, prob, g_val in children:
+                if seq_id is None:
+                    key = ("v", g_val)
+                    coefs[key] = coefs.get(key, 0.0) + 1.0
+                else:
+                    key = ("r", seq_keys[seq_id])
+                    coefs[key] = coefs.get(key, 0.0) + prob * g_val
+            if parent == (None, None):
+                own = ("root",)
+            else:
+                own = ("v", parent[0])
+                cols.add(own)
+            coefs[own] = coefs.get(own, 0.0) - 1.0
+            rows[("sum",) + parent] = (coefs, sense, 0.0)
+
+        return cols, rows
+
+    def solve(self, root: History) -> float:
+        """
+        Solve the game, reusing the model from the previous call where possible.
+
+        :param root: root history of the (possibly edited) EFG tree
+        :return: expected value in the root for the solver's player
+        """
+        cols, rows = self.compile(root)
+
+        if self.m is None:
+            self.m = gb.Model("tree_game")
+            self.m.setParam("OutputFlag", 0)
+
+        removed_cols = [key for key in self.vars if key not in cols]
+        removed_rows = [key for key, row in self.rows.items()
+                        if key not in rows or rows[key][:3] != row[:3]]
+        for key in removed_rows:
+            self.m.remove(self.rows.pop(key)[3])
+        for key in removed_cols:
+            self.m.remove(self.vars.pop(key))
+
+        added_cols = [key for key in cols if key not in self.vars]
+        for key in added_cols:
+            self.vars[key] = self.m.addVar(name="_".join(map(str, key)))
+        if ("root",) in added_cols:
+            self.m.setObjective(self.vars[("root",)],
+                                GRB.MAXIMIZE if self.player == 0 else GRB.MINIMIZE)
+
+        added_rows = [key for key in rows if key not in self.rows]
+        for key in added_rows:
+            coefs, sense, rhs = rows[key]
+            expr = gb.LinExpr(list(coefs.values()), [self.vars[k] for k in coefs])
+            self.rows[key] = (coefs, sense, rhs, self.m.addLConstr(expr, sense, rhs))
+
+        self.changes = {
+            "removed_cols": len(removed_cols),
+            "added_cols": len(added_cols),
+            "removed_rows": len(removed_rows),
+            "added_rows": len(added_rows),
+        }
+
+        # the model is modified in place, so gurobi warm-starts from the last basis
+        self.m.optimize()
+
+        # I minimize the first player's utility, thus for the second player i must return the negative value
+        return self.m.ObjVal if self.player == 0 else -self.m.ObjVal
+
+
+if __name__ == '__main__':
+    # usage: python incremental_lp.py player maze_file [maze_file ...]
+    # solves the mazes one after another, each as an edit of the previous one
+    solver = IncrementalSolver(Player(int(sys.argv[1])))
+    for path in sys.argv[2:]:
+        with open(path) as f:
+            root_history = History(Game(f.read().splitlines()))
+        print(path, solver.solve(root_history), solver.changes)
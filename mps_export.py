@@ -0,0 +1,155 @@
+# Out-of-core construction of the sequence-form LP into an MPS file.
+#
+# The tree is walked once, the LP coefficients are buffered in chunks of
+# bounded size, every full chunk is sorted and spilled to a temporary file.
+# The chunks are then merged (still streaming) into a (free) MPS file, which
+# any LP solver can read. Only the current path in the tree and one chunk are
+# kept in memory.
+#
+# It is the same LP as in root_value, with the sequences named by their last
+# (infoset index, action index) and the infoset values free. The objective is
+# always minimized, its optimal value is minus the value of the game for the player.
+from game_lp import *
+
+import heapq
+import os
+import sys
+import tempfile
+from itertools import groupby
+
+
+class Spill:
+    """Sorted chunks of tuples on disk."""
+
+    def __init__(self, directory: str, name: str, chunk_size: int):
+        self.directory = directory
+        self.name = name
+        self.chunk_size = chunk_size
+        self.buffer = []
+        self.paths = []
+
+    def add(self, *entry):
+        self.buffer.append(entry)
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if len(self.buffer) == 0:
+            return
+        self.buffer.sort()
+        path = os.path.join(self.directory, f"{self.name}_{len(self.paths)}")
+        with open(path, "w") as f:
+            for entry in self.buffer:
+                f.write(" ".join(map(str, entry)) + "\n")
+        self.paths.append(path)
+        self.buffer = []
+
+    def merged(self):
+        """All the tuples (as tuples of strings) in sorted order."""
+        self.flush()
+        files = [open(path) for path in self.paths]
+        try:
+            yield from heapq.merge(*[map(str.split, f) for f in files])
+        finally:
+            for f in files:
+                f.close()
+
+
+def export_mps(root: History, player: Player, path: str, chunk_size: int = 10 ** 6):
+    """
+    Write the sequence-form LP of the tree for the player to an MPS file.
+
+    :param root: root history of the EFG tree
+    :param player: zero-indexed player the LP is built for
+    :param path: path of the MPS file
+    :param chunk_size: number of coefficients kept in memory before they are spilled to disk
+    """
+    player = int(player)
+    o_player = (player + 1) % 2
+    # sequence form rows of the opponent's sequences, the rest are equalities
+    sense = "G" if player == 0 else "L"
+
+    def seq_name(prefix, seq):
+        return f"{prefix}_root" if seq is None else f"{prefix}_{seq[0]}_{seq[1]}"
+
+    with tempfile.TemporaryDirectory() as directory:
+        # (row, type)
+        rows = Spill(directory, "rows", chunk_size)
+        # (column, row, "s" - coefficients summed | "u" - same coefficient repeated, coefficient)
+        coefs = Spill(directory, "coefs", chunk_size)
+
+        rows.add("c_root", sense)
+        coefs.add("v_root", "c_root", "u", -1.0)
+        coefs.add("v_root", "obj", "u", -1.0 if player == 0 else 1.0)
+
+        def walk(h, prob, seqs):
+            t = h.type()
+            if t == HistoryType.terminal:
+                coefs.add(seq_name("r", seqs[player]), seq_name("c", seqs[o_player]), "s", prob * h.utility())
+
+            elif t == HistoryType.chance:
+                for a in h.actions():
+                    walk(h.child(a), prob * h.chance_prob(a), seqs)
+
+            else:
+                curr_player = int(h.current_player())
+                actions = h.actions()
+                info_idx = h.infoset().index()
+                if curr_player == player:
+                    # the next sequences sum to the current one
+                    rows.add(f"n_{info_idx}", "E")
+                    coefs.add(seq_name("r", seqs[player]), f"n_{info_idx}", "u", -1.0)
+                    for a_id in range(len(actions)):
+                        coefs.add(f"r_{info_idx}_{a_id}", f"n_{info_idx}", "u", 1.0)
+                else:
+                    coefs.add(f"v_{info_idx}", seq_name("c", seqs[o_player]), "u", 1.0)
+                    for a_id in range(len(actions)):
+                        rows.add(f"c_{info_idx}_{a_id}", sense)
+                        coefs.add(f"v_{info_idx}", f"c_{info_idx}_{a_id}", "u", -1.0)
+
+                for a_id, a in enumerate(actions):
+                    next_seqs = list(seqs)
+                    next_seqs[curr_player] = (info_idx, a_id)
+                    walk(h.child(a), prob, next_seqs)
+
+        walk(root, 1.0, [None, None])
+
+        with open(path, "w") as f:
+            f.write("NAME tree_game\n")
+            f.write("ROWS\n")
+            f.write(" N obj\n")
+            for (row, row_type), _ in groupby(rows.merged()):
+                f.write(f" {row_type} {row}\n")
+
+            f.write("COLUMNS\n")
+            free = Spill(directory, "free", chunk_size)
+            for col, col_entries in groupby(coefs.merged(), key=lambda e: e[0]):
+                written = False
+                for row, entries in groupby(col_entries, key=lambda e: e[1]):
+                    entries = list(entries)
+                    if entries[0][2] == "s":
+                        coef = sum(float(e[3]) for e in entries)
+                    else:
+                        coef = float(entries[0][3])
+                    if coef != 0:
+                        f.write(f"    {col} {row} {coef!r}\n")
+                        written = True
+                if not written:
+                    # the column must be declared even if all its coefficients are zero
+                    f.write(f"    {col} obj 0.0\n")
+                if col.startswith("v_"):
+                    free.add(col)
+
+            f.write("RHS\n")
+            f.write("BOUNDS\n")
+            f.write(" FX BND r_root 1\n")
+            for col, in free.merged():
+                f.write(f" FR BND {col}\n")
+            f.write("ENDATA\n")
+
+
+if __name__ == '__main__':
+    # usage: python mps_export.py mps_file, with the same input as game_lp.py
+    root_history = create_root()
+    player = int(input())
+    export_mps(root_history, player, sys.argv[1])
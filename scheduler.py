@@ -0,0 +1,212 @@
+# Asyncio scheduler for queues of export_gambit and root_value jobs.
+#
+# Jobs are ordered by an estimate of the size of their game tree, smallest
+# first, so one huge maze does not hold back dozens of small ones. The jobs run
+# in a process pool, every job can be cancelled and can have a deadline.
+#
+# A job that hits its deadline (or is cancelled) while already running is
+# reported as such right away, but its worker process finishes the job in the
+# background - processes of a pool cannot be interrupted. Until then, the
+# process counts as running and gets no new job.
+import asyncio
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count
+from math import comb
+from typing import Optional
+
+from game_tree import *
+
+
+def estimate_size(game: Game, limit: int = 2000) -> int:
+    """
+    Cheap estimate of the number of histories in the game tree of the maze.
+
+    Counts the agent's paths over crossroads (at most limit of them, so the
+    estimate stays cheap) and multiplies them by the number of bandit
+    placements and the number of their swaps.
+    """
+    n_placements = 1
+    n_swaps = 1
+    if game.n_bandits > 0 and len(game.dangers) > 0:
+        n_placements = comb(len(game.dangers), game.n_bandits)
+        n_swaps = 1 + game.n_bandits * max(len(game.dangers) - game.n_bandits, 0)
+
+    n_paths = 0
+    # (crossroad, visited crossroads)
+    stack = [(game.start_pos, frozenset())]
+    while len(stack) > 0 and n_paths < limit:
+        pos, visited = stack.pop()
+        n_paths += 1
+        if game.goal(pos):
+            continue
+        for action in game.get_actions(pos):
+            end = game.corridor_end(pos, action)
+            if end != pos and end not in visited:
+                stack.append((end, visited | {pos}))
+    return n_placements * n_swaps * n_paths
+
+
+def run_job(kind: str, maze: str, player: int):
+    # executed in the worker processes
+    root_history = History(Game(maze.splitlines()))
+    if kind == "export":
+        return export_gambit(root_history)
+    from game_lp import root_value
+    return root_value(root_history, player)
+
+
+class Job:
+    def __init__(self, kind: str, maze: str, player: int, size: int):
+        self.kind = kind
+        self.maze = maze
+        self.player = player
+        self.size = size
+        self.future = asyncio.get_running_loop().create_future()
+        self.submitted = time.monotonic()
+        self.started = None
+        self.finished = None
+        self.timer = None  # fails the job at its deadline
+
+    def cancel(self) -> bool:
+        return self.future.cancel()
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def __await__(self):
+        return self.future.__await__()
+
+
+class JobScheduler:
+    def __init__(self, workers: int = 4, history: int = 1000):
+        self.workers = workers
+        self.queue = asyncio.PriorityQueue()
+        self.pool = None
+        # free processes of the pool
+        self.slots = None
+        self.tasks = []
+        self.order = count()
+        self.running = 0
+        self.counts = {"done": 0, "failed": 0, "cancelled": 0, "timed_out": 0}
+        # latencies of the last finished jobs, in seconds
+        self.wait_times = deque(maxlen=history)
+        self.run_times = deque(maxlen=history)
+
+    async def start(self):
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.slots = asyncio.Semaphore(self.workers)
+        self.tasks = [asyncio.create_task(self.__worker()) for _ in range(self.workers)]
+
+    async def close(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, kind: str, maze: str, player: int = 0, timeout: Optional[float] = None) -> Job:
+        """
+        Queue a job, await the returned Job for its result.
+
+        :param kind: "export" for export_gambit, "solve" for root_value
+        :param maze: maze specification, the lines of an examples/in*.txt file
+        :param player: zero-indexed player, only used by "solve"
+        :param timeout: seconds from now until the job fails with asyncio.TimeoutError
+        """
+        if kind not in ("export", "solve"):
+            raise ValueError(f"unknown job kind {kind}")
+        size = estimate_size(Game(maze.splitlines()))
+        job = Job(kind, maze, player, size)
+        if timeout is not None:
+            job.timer = asyncio.get_running_loop().call_later(timeout, self.__expire, job)
+        job.future.add_done_callback(lambda _: self.__finished(job))
+        self.queue.put_nowait((size, next(self.order), job))
+        return job
+
+    def metrics(self) -> dict:
+        def stats(times):
+            if len(times) == 0:
+                return {"mean": None, "max": None}
+            return {"mean": sum(times) / len(times), "max": max(times)}
+
+        return {
+            "queue_depth": self.queue.qsize(),
+            "running": self.running,
+            **self.counts,
+            "wait_time": stats(self.wait_times),
+            "run_time": stats(self.run_times),
+        }
+
+    def __expire(self, job: Job):
+        if not job.done():
+            job.future.set_exception(asyncio.TimeoutError())
+            self.counts["timed_out"] += 1
+
+    def __finished(self, job: Job):
+        if job.timer is not None:
+            job.timer.cancel()
+        if job.future.cancelled():
+            self.counts["cancelled"] += 1
+
+    def __release(self, execution):
+        # the process is free only once it really finished, even if its job was abandoned
+        self.running -= 1
+        self.slots.release()
+        if not execution.cancelled():
+            execution.exception()  # retrieve it, abandoned jobs would log it as never retrieved
+
+    async def __worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, job = await self.queue.get()
+            try:
+                # cancelled and timed out jobs are skipped
+                if not job.done():
+                    await self.__run(loop, job)
+            finally:
+                self.queue.task_done()
+
+    async def __run(self, loop, job: Job):
+        await self.slots.acquire()
+        if job.done():
+            self.slots.release()
+            return
+        job.started = time.monotonic()
+        self.wait_times.append(job.started - job.submitted)
+
+        self.running += 1
+        execution = loop.run_in_executor(self.pool, run_job, job.kind, job.maze, job.player)
+        execution.add_done_callback(self.__release)
+        await asyncio.wait({execution, job.future}, return_when=asyncio.FIRST_COMPLETED)
+        job.finished = time.monotonic()
+
+        if job.done():
+            # cancelled or timed out while running
+            return
+        if execution.exception() is not None:
+            job.future.set_exception(execution.exception())
+            self.counts["failed"] += 1
+        else:
+            job.future.set_result(execution.result())
+            self.run_times.append(job.finished - job.started)
+            self.counts["done"] += 1
+
+
+if __name__ == '__main__':
+    # usage: python scheduler.py export|solve player maze_file [maze_file ...]
+    async def main():
+        scheduler = JobScheduler()
+        await scheduler.start()
+        jobs = {}
+        for path in sys.argv[3:]:
+            with open(path) as f:
+                jobs[path] = scheduler.submit(sys.argv[1], f.read(), int(sys.argv[2]))
+        for path, job in jobs.items():
+            result = await job
+            print(path, result if sys.argv[1] == "solve" else f"{len(result)} characters")
+        print(scheduler.metrics())
+        await scheduler.close()
+
+    asyncio.run(main())
@@ -0,0 +1,156 @@
+# Long-running solve service.
+#
+# Importing gurobipy, acquiring the licence and creating an environment costs
+# more than solving a small maze, so the service keeps them warm between
+# requests, together with a cache of compiled trees.
+#
+# Protocol: one JSON request per line, one JSON response per line.
+#   request:  {"id": 1, "maze": "<maze spec, as in examples/in*.txt>", "player": 0}
+#   response: {"id": 1, "value": 7.09, "strategy": [[[[infoset, action], ...], prob], ...]}
+#             {"id": 1, "error": "<message>"} if the request could not be solved
+# Responses are written as the requests finish, so they can come out of order.
+#
+# Gurobi environments must not be shared by concurrently running threads,
+# thus every worker of the (bounded) pool keeps its own environment.
+from game_lp import *
+
+import json
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from socketserver import StreamRequestHandler, ThreadingUnixStreamServer
+
+
+class SolverService:
+    def __init__(self, workers: int = 4, cache_size: int = 32, backlog: int = 4):
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        # at most backlog requests per worker are accepted, reading blocks until one finishes
+        self.pending = threading.BoundedSemaphore(workers * backlog)
+        self.local = threading.local()
+        # (maze spec, player) -> compiled tree, least recently used first
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.cache_lock = threading.Lock()
+
+    def env(self) -> gb.Env:
+        # one environment per worker thread, created on its first request
+        if not hasattr(self.local, "env"):
+            env = gb.Env(empty=True)
+            env.setParam("OutputFlag", 0)
+            env.start()
+            self.local.env = env
+        return self.local.env
+
+    def compiled(self, maze: str, player: int):
+        key = (maze, player)
+        with self.cache_lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+        game = Game(maze.splitlines())
+        # indexed per game, the global infoset maps would grow with every request
+        game.infoset_maps = InfosetMaps()
+        compiled = compile_lp(History(game), player)
+        with self.cache_lock:
+            self.cache[key] = compiled
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return compiled
+
+    def solve(self, maze: str, player: int) -> dict:
+        """
+        Solve the maze for the given player.
+
+        :param maze: maze specification, the lines of an examples/in*.txt file
+        :param player: zero-indexed player
+        :return: dict with the value in the root and the player's realization plan
+        """
+        value, plan = solve_lp(self.compiled(maze, player), player, self.env())
+        return {
+            "value": value,
+            "strategy": [[list(map(list, seq)), prob] for seq, prob in plan.items()],
+        }
+
+    def handle(self, line: str, write):
+        """
+        Parse one request line and solve it in the pool.
+        Blocks while too many requests are pending.
+
+        :param line: JSON request
+        :param write: called with the response dict once the request is done
+        :return: future of the solve, None if the request is invalid
+        """
+        try:
+            request = json.loads(line)
+            maze = request["maze"]
+            if isinstance(maze, list):
+                maze = "\n".join(maze)
+            player = int(request["player"])
+        except (ValueError, KeyError, TypeError) as e:
+            write({"id": None, "error": f"invalid request: {e}"})
+            return None
+
+        def run():
+            try:
+                try:
+                    response = self.solve(maze, player)
+                except Exception as e:
+                    response = {"error": f"{type(e).__name__}: {e}"}
+                response["id"] = request.get("id")
+                write(response)
+            finally:
+                self.pending.release()
+
+        self.pending.acquire()
+        return self.pool.submit(run)
+
+    def serve_lines(self, inp, out):
+        """Serve requests read from inp line by line until it is closed."""
+        out_lock = threading.Lock()
+
+        def write(response):
+            with out_lock:
+                out.write(json.dumps(response) + "\n")
+                out.flush()
+
+        for line in inp:
+            if line.strip():
+                self.handle(line, write)
+
+    def serve_socket(self, path: str):
+        """Serve every connection to the unix socket at path with the line protocol."""
+        service = self
+
+        class Handler(StreamRequestHandler):
+            def handle(self):
+                out_lock = threading.Lock()
+
+                def write(response):
+                    with out_lock:
+                        self.wfile.write((json.dumps(response) + "\n").encode())
+                        self.wfile.flush()
+
+                futures = [service.handle(line.decode(), write) for line in self.rfile if line.strip()]
+                # keep the connection open until all of its requests are answered
+                for future in futures:
+                    if future is not None:
+                        future.result()
+
+        with ThreadingUnixStreamServer(path, Handler) as server:
+            server.serve_forever()
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+
+if __name__ == '__main__':
+    # usage: python solver_service.py [workers] [unix socket path]
+    # without a socket path, requests are read from stdin and answered to stdout
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    service = SolverService(workers)
+    if len(sys.argv) > 2:
+        service.serve_socket(sys.argv[2])
+    else:
+        service.serve_lines(sys.stdin, sys.stdout)
+        service.close()
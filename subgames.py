@@ -0,0 +1,150 @@
+# Subgame decomposition of the sequence-form LP.
+#
+# A history is the root of a (proper) subgame if every infoset with a history
+# in its subtree lies completely in that subtree. In a zero-sum game, such a
+# subgame can be replaced by a terminal with the value of the subgame without
+# changing the value of the whole game. The topmost subgames are solved
+# independently (in parallel), then the trunk - the tree with the subgames
+# replaced by terminals - is solved as usual.
+from game_lp import *
+
+from concurrent.futures import ProcessPoolExecutor
+
+
+def find_subgames(root: History, min_size: int = 10):
+    """
+    Find the topmost subgame roots below the root.
+
+    :param root: root history of the EFG tree
+    :param min_size: smaller subgames (in number of histories) are kept in the trunk
+    :return: list of paths from the root to the subgame roots, as tuples of action indices
+    """
+    # per history, in preorder
+    infosets = []  # infoset index, None for chance and terminal histories
+    ends = []  # position after the last history of the subtree
+    parents = []  # (position of the parent, action index), None for the root
+    # infoset index -> (first position, last position)
+    spans = {}
+
+    def walk(h, parent):
+        pos = len(infosets)
+        parents.append(parent)
+        ends.append(None)
+        t = h.type()
+        if t == HistoryType.decision:
+            info_idx = h.infoset().index()
+            first, last = spans.get(info_idx, (pos, pos))
+            spans[info_idx] = (min(first, pos), max(last, pos))
+            infosets.append(info_idx)
+        else:
+            infosets.append(None)
+        if t != HistoryType.terminal:
+            for a_id, a in enumerate(h.actions()):
+                walk(h.child(a), (pos, a_id))
+        ends[pos] = len(infosets)
+
+    walk(root, None)
+
+    # span of all infosets in the subtree of each history, computed from the leaves up
+    n = len(infosets)
+    low = [spans[i][0] if i is not None else pos for pos, i in enumerate(infosets)]
+    high = [spans[i][1] if i is not None else pos for pos, i in enumerate(infosets)]
+    for pos in range(n - 1, 0, -1):
+        parent = parents[pos][0]
+        low[parent] = min(low[parent], low[pos])
+        high[parent] = max(high[parent], high[pos])
+
+    paths = []
+    pos = 1
+    while pos < n:
+        if ends[pos] - pos >= max(min_size, 2) and low[pos] >= pos and high[pos] < ends[pos]:
+            path = []
+            node = pos
+            while parents[node] is not None:
+                node, a_id = parents[node]
+                path.append(a_id)
+            paths.append(tuple(reversed(path)))
+            pos = ends[pos]
+        else:
+            pos += 1
+    return paths
+
+
+class TrunkHistory:
+    """History of the trunk, the subgames are replaced by terminals with their values."""
+
+    def __init__(self, h: History, path, values):
+        self.h = h
+        self.path = path
+        # path -> first player's value of the subgame
+        self.values = values
+        self.actions_list = None
+
+    def type(self) -> HistoryType:
+        if self.path in self.values:
+            return HistoryType.terminal
+        return self.h.type()
+
+    def current_player(self) -> Player:
+        return self.h.current_player()
+
+    def infoset(self) -> Infoset:
+        return self.h.infoset()
+
+    def actions(self) -> List[Action]:
+        # the same objects every time, child finds the action's index among them
+        if self.actions_list is None:
+            self.actions_list = self.h.actions()
+        return self.actions_list
+
+    def utility(self) -> float:
+        if self.path in self.values:
+            return self.values[self.path]
+        return self.h.utility()
+
+    def chance_prob(self, action: Action) -> float:
+        return self.h.chance_prob(action)
+
+    def child(self, action: Action) -> 'TrunkHistory':
+        a_id = next(i for i, a in enumerate(self.actions()) if a is action)
+        return TrunkHistory(self.h.child(action), self.path + (a_id,), self.values)
+
+    def __str__(self):
+        return str(self.h)
+
+
+def decomposed_root_value(root: History, player: Player, workers: Optional[int] = None,
+                          min_size: int = 10) -> float:
+    """
+    Solve the subgames separately and in parallel, then the trunk - same value as root_value.
+
+    :param root: root history of the EFG tree
+    :param player: zero-indexed player
+    :param workers: number of processes solving the subgames, number of cpus if None
+    :param min_size: smaller subgames (in number of histories) are kept in the trunk
+    :return: expected value in the root for given player
+    """
+    player = int(player)
+    paths = find_subgames(root, min_size)
+    subroots = []
+    for path in paths:
+        h = root
+        for a_id in path:
+            h = h.child(h.actions()[a_id])
+        subroots.append(h)
+
+    values = {}
+    if len(subroots) > 0:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for path, value in zip(paths, pool.map(root_value, subroots, [player] * len(subroots))):
+                # the trunk's terminals hold the first player's utility
+                values[path] = value if player == 0 else -value
+
+    return root_value(TrunkHistory(root, (), values), player)
+
+
+if __name__ == '__main__':
+    # same input as game_lp.py
+    root_history = create_root()
+    player = int(input())
+    print(decomposed_root_value(root_history, player))